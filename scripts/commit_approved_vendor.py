@@ -2,10 +2,19 @@ import os
 import sys
 import json
 import re
+import functools
+import shutil
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from urllib.parse import unquote
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+# --- Optional: orjson for faster registry parsing ---
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Refactored Imports ---
 sys.path.append(str(Path(__file__).parent.parent))
@@ -22,19 +31,50 @@ SUPPLIERS_ROOT = Path("suppliers")
 PROCESSOR_DIR = SUPPLIERS_ROOT / "subprocessors"
 GENERAL_DIR = SUPPLIERS_ROOT / "general_vendors"
 SOURCE_DIR = Path("_vendor_analysis_source")
+COPY_BUFFER_SIZE = 1 << 20
+MAX_IO_WORKERS = 8
+
+APPROVED_DATA_HEADER = "## 📝 Reviewer-Approved Data"
+
+_json_loads = orjson.loads if orjson else json.loads
+
+def _iso_date(d: datetime) -> str:
+    """Formats a date as YYYY-MM-DD without going through strftime."""
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+
+def _json_dumps_pretty(obj) -> bytes:
+    """
+    Serializes the committed registry exactly as json.dump(obj, f, indent=2) always has
+    (non-ASCII escaped), so rewrites don't churn existing entries. orjson can't escape
+    non-ASCII, so it is only used for reading.
+    """
+    return json.dumps(obj, indent=2).encode("ascii")
+
+# --- Precompiled Patterns ---
+# One checklist row: "- [x] **Tags**: [`name`](link) (Source: url)"; link text may itself contain brackets
+_LINE_PATTERN = re.compile(r"^-\s*\[([ xX])\][^\[]*\[.*?\]\(([^)]+)\)(?:[^(]*\((?:Source:\s*)?(https?://[^)\s]+)\))?")
+
+def _extract_approved_json_block(body):
+    """Returns the raw ```json block following the approved-data header, or None."""
+    header_idx = body.find(APPROVED_DATA_HEADER)
+    if header_idx == -1: return None
+    start = body.find("```json", header_idx)
+    if start == -1: return None
+    start += len("```json")
+    end = body.find("```", start)
+    if end == -1: return None
+    return body[start:end].strip()
 
-# ... [fetch_comments_and_approved_json function remains unchanged] ...
 def fetch_comments_and_approved_json(repo_name, issue_number):
     """Fetches comments and the approved JSON block."""
     all_comments = fetch_issue_comments(repo_name, issue_number)
-    json_pattern = re.compile(r"## 📝 Reviewer-Approved Data.*?```json\s*(\{.*?\})\s*```", re.DOTALL)
 
     approved_json = None
     for comment in reversed(all_comments):
-        match = re.search(json_pattern, comment.get("body", ""))
-        if match:
+        block = _extract_approved_json_block(comment.get("body") or "")
+        if block:
             try:
-                approved_json = json.loads(match.group(1))
+                approved_json = _json_loads(block)
                 break
             except json.JSONDecodeError: continue
     
@@ -45,53 +85,54 @@ def fetch_comments_and_approved_json(repo_name, issue_number):
 
 # get_vendor_type and get_sanitized_vendor_name are now imported from utils.github_api
 
-# ... [update_central_json function remains unchanged] ...
-# (This logic is already correct; it updates dates and overwrites the JSON record)
-
-def update_central_json(summary_data, vendor_type):
+def update_central_json(summary_data, vendor_type, closed_date, date_str):
     """Updates the central JSON registry."""
-    # [Implementation from previous version is correct and retained]
-    # ... (Calculates next review date and updates JSON file) ...
-    # For brevity in this diff, assuming the logic from your upload
-    
     processor_name = summary_data.get("processor_name")
     if not processor_name: return
 
-    # Recalculate dates (Copied from previous provided code)
-    closed_at_str = os.getenv("ISSUE_CLOSED_AT")
-    closed_date = datetime.utcnow()
-    if closed_at_str:
-        closed_date = datetime.fromisoformat(closed_at_str.rstrip("Z"))
-    
-    summary_data["last_review_date"] = closed_date.strftime("%Y-%m-%d")
+    # Recalculate dates from the issue's (already parsed) close time
+    summary_data["last_review_date"] = date_str
     
     # Calculate next review
     risk = summary_data.get("risk_rating", "Medium").lower()
     days = 180 if risk == "high" else (730 if risk == "low" else 365)
-    summary_data["next_review_date"] = (closed_date + timedelta(days=days)).strftime("%Y-%m-%d")
+    summary_data["next_review_date"] = _iso_date(closed_date + timedelta(days=days))
 
     # Select File
     target_file = (PROCESSOR_DIR / "data-processors.json") if vendor_type == "processor" else (GENERAL_DIR / "all-general-vendors.json")
     target_file.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        with open(target_file, 'r') as f: 
-            all_records = json.load(f)
+        with open(target_file, 'rb') as f: 
+            all_records = _json_loads(f.read())
     except (FileNotFoundError, json.JSONDecodeError): 
         all_records = []
 
-    # Update or Append
-    found = False
+    # Update or Append (first record wins if a name is duplicated)
+    index = {}
     for i, rec in enumerate(all_records):
-        if rec.get("processor_name") == processor_name:
-            all_records[i] = summary_data
-            found = True
-            break
-    if not found: all_records.append(summary_data)
-    
-    all_records.sort(key=lambda x: x.get("processor_name", "").lower())
+        index.setdefault(rec.get("processor_name"), i)
+
+    i = index.get(processor_name)
+    if i is not None:
+        all_records[i] = summary_data
+    else:
+        # The registry is written sorted, so only an out-of-order append needs a re-sort
+        needs_sort = bool(all_records) and processor_name.lower() < all_records[-1].get("processor_name", "").lower()
+        all_records.append(summary_data)
+        if needs_sort:
+            all_records.sort(key=lambda x: x.get("processor_name", "").lower())
     
-    with open(target_file, 'w') as f: json.dump(all_records, f, indent=2)
+    # Write to a sibling temp file and swap it in, so a failed run never leaves a truncated registry
+    tmp_file = target_file.with_name(target_file.name + ".tmp")
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps_pretty(all_records))
+        os.replace(tmp_file, target_file)
+    except Exception:
+        # Don't leave the .tmp sibling behind for a later `git add` to pick up
+        tmp_file.unlink(missing_ok=True)
+        raise
     print(f"✅ Updated JSON registry at {target_file}")
 
 
@@ -107,55 +148,80 @@ def create_audit_markdown_file(full_issue_body, all_comments, issue_url, vendor_
     is_update = file_path.exists()
     mode = 'a' if is_update else 'w'
     
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d")
+    timestamp = _iso_date(datetime.now(timezone.utc))
     
+    parts: list[str] = []
+    if is_update:
+        # Append Header
+        parts.append("\n\n---\n\n")
+        parts.append(f"# 🔄 Review: {timestamp}\n\n")
+        parts.append(f"**Review Issue:** [{issue_url}]({issue_url})\n\n")
+    else:
+        # New File Header
+        parts.append(f"# Vendor Audit: {sanitized_vendor_name.capitalize()}\n\n")
+        parts.append(f"**Original Issue:** [{issue_url}]({issue_url})\n\n")
+        parts.append("---\n\n")
+
+    # Write Content (Same format for both)
+    parts.append("## 📄 Context & Request\n\n")
+    parts.append(full_issue_body)
+    parts.append("\n\n---\n\n")
+
+    parts.append("## 💬 Discussion & Analysis Log\n\n")
+    if not all_comments:
+        parts.append("*No comments found on the issue.*\n")
+
+    for comment in all_comments:
+        author = comment.get("user", {}).get("login", "unknown")
+        body = comment.get("body", "*No comment body*")
+        created_at = comment.get("created_at", "unknown")
+
+        parts.append(f"### @{author} ({created_at})\n")
+        parts.append(body)
+        parts.append("\n\n")
+
     try:
         with open(file_path, mode, encoding='utf-8') as f:
-            
-            if is_update:
-                # Append Header
-                f.write(f"\n\n---\n\n")
-                f.write(f"# 🔄 Review: {timestamp}\n\n")
-                f.write(f"**Review Issue:** [{issue_url}]({issue_url})\n\n")
-            else:
-                # New File Header
-                f.write(f"# Vendor Audit: {sanitized_vendor_name.capitalize()}\n\n")
-                f.write(f"**Original Issue:** [{issue_url}]({issue_url})\n\n")
-                f.write("---\n\n")
-
-            # Write Content (Same format for both)
-            f.write("## 📄 Context & Request\n\n")
-            f.write(full_issue_body)
-            f.write("\n\n---\n\n")
-            
-            f.write("## 💬 Discussion & Analysis Log\n\n")
-            if not all_comments:
-                f.write("*No comments found on the issue.*\n")
-            
-            for comment in all_comments:
-                author = comment.get("user", {}).get("login", "unknown")
-                body = comment.get("body", "*No comment body*")
-                created_at = comment.get("created_at", "unknown")
-                
-                f.write(f"### @{author} ({created_at})\n")
-                f.write(body)
-                f.write("\n\n")
-                
+            f.write("".join(parts))
         print(f"✅ Audit file updated at: {file_path}")
         
     except IOError as e:
         log("error", f"Failed to write audit file {file_path}", details=str(e))
         sys.exit(1)
 
-# ... [parse_files_from_checklist, archive_approved_files, cleanup_source_directory remain unchanged] ...
-# (Copy these verbatim from your uploaded file)
-def parse_files_from_checklist(issue_body, issue_number, check_status="[x]"):
-    pattern = re.compile(
-        r"-\s*" + re.escape(check_status) + r".*?\[.*?\]\((?:.*?)(" + 
-        r"_vendor_analysis_source/issue-" + re.escape(issue_number) + r".*?)\)" +
-        r".*?\((https?://.*?)\)", re.IGNORECASE | re.DOTALL)
-    matches = pattern.findall(issue_body)
-    return [(Path(unquote(p)), u) for p, u in matches]
+# --- Checklist Parsing, Archiving & Cleanup ---
+
+@functools.lru_cache(maxsize=4)
+def _parse_all_checklist(issue_body, issue_number):
+    """
+    Parses the checklist once, returning {"x": checked, " ": unchecked}
+    where each value is a tuple of (Path, url) pairs.
+    Rows without a "(Source: ...)" URL fall back to their checklist link.
+    """
+    prefix = f"{SOURCE_DIR.as_posix()}/issue-{issue_number}-"
+    parsed = {"x": [], " ": []}
+    for line in issue_body.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if not match: continue
+        status, link, source_url = match.groups()
+        idx = link.find(f"{SOURCE_DIR.as_posix()}/")
+        if idx < 0: continue
+        p = link[idx:]
+        if not p.startswith(prefix): continue
+        # Most generated filenames carry no percent-escapes, so skip unquote for those
+        local_path = Path(unquote(p) if "%" in p else p)
+        parsed[status.lower()].append((local_path, source_url or link))
+    return {status: tuple(files) for status, files in parsed.items()}
+
+def _archive_one(local_path, url, new_path, date_str):
+    try:
+        header = f"Original Source: {url}\nApproved: {date_str}\n{'-'*20}\n\n"
+        # Stream the source after the header rather than loading it into memory
+        with open(local_path, 'rb') as src, open(new_path, 'wb') as dst:
+            dst.write(header.encode('utf-8'))
+            shutil.copyfileobj(src, dst, length=COPY_BUFFER_SIZE)
+    except Exception as e:
+        log("error", f"Failed to archive {local_path} to {new_path}", details=str(e))
 
 def archive_approved_files(approved_files, vendor_type, sanitized_vendor_name, date_str):
     if not approved_files: return
@@ -163,19 +229,25 @@ def archive_approved_files(approved_files, vendor_type, sanitized_vendor_name, d
     dest_dir = base_dir / f"{sanitized_vendor_name}/approved-terms/{date_str}"
     dest_dir.mkdir(parents=True, exist_ok=True)
     
+    # Resolve destinations up front: rows sharing a destination name keep the last one,
+    # as the sequential copy did, and no two threads ever write the same file
+    jobs = {}
     for local_path, url in approved_files:
         if not local_path.exists(): continue
-        try:
-            new_path = dest_dir / local_path.name.split('-', 2)[-1]
-            content = f"Original Source: {url}\nApproved: {date_str}\n{'-'*20}\n\n{local_path.read_text(encoding='utf-8')}"
-            new_path.write_text(content, encoding='utf-8')
-        except Exception as e: print(f"Error archiving {local_path}: {e}")
+        new_path = dest_dir / local_path.name.split('-', 2)[-1]
+        if new_path in jobs:
+            log("warning", f"Archive name collision for {new_path.name}; keeping {local_path}")
+        jobs[new_path] = (local_path, url)
+    if not jobs: return
+    
+    # Archiving is pure file I/O, so threads overlap the reads and writes
+    with ThreadPoolExecutor(max_workers=min(MAX_IO_WORKERS, len(jobs))) as ex:
+        list(ex.map(lambda item: _archive_one(item[1][0], item[1][1], item[0], date_str), jobs.items()))
 
 def cleanup_source_directory(issue_body, issue_number):
-    checked = parse_files_from_checklist(issue_body, issue_number, "[x]")
-    unchecked = parse_files_from_checklist(issue_body, issue_number, "[ ]")
-    for p, _ in (checked + unchecked):
-        if p.exists(): p.unlink()
+    checklist = _parse_all_checklist(issue_body, issue_number)
+    paths = {p for files in checklist.values() for p, _ in files}
+    for p in paths: p.unlink(missing_ok=True)
 
 def main():
     load_dotenv()
@@ -194,15 +266,16 @@ def main():
     vendor_type = get_vendor_type(issue_body)
     approved_json, all_comments = fetch_comments_and_approved_json(repo_name, issue_number)
     vendor_name = get_sanitized_vendor_name(approved_json)
-    date_str = datetime.fromisoformat(issue_closed_at.rstrip("Z")).strftime("%Y-%m-%d")
+    closed_date = datetime.fromisoformat(issue_closed_at.replace("Z", "+00:00"))
+    date_str = _iso_date(closed_date)
 
     # 3. Execution
-    update_central_json(approved_json, vendor_type)
+    update_central_json(approved_json, vendor_type, closed_date, date_str)
     
     # THIS is the key change: calling the logic that handles both New and Existing
     create_audit_markdown_file(issue_body, all_comments, issue_url, vendor_type, vendor_name)
     
-    approved_files = parse_files_from_checklist(issue_body, issue_number, "[x]")
+    approved_files = _parse_all_checklist(issue_body, issue_number)["x"]
     archive_approved_files(approved_files, vendor_type, vendor_name, date_str)
     
     cleanup_source_directory(issue_body, issue_number)
@@ -2,20 +2,32 @@ import os
 import sys
 import json
 import re
-import requests
+import functools
 from pathlib import Path
-from dotenv import load_dotenv
-from typing import Dict, List, Set, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 from urllib.parse import unquote
 
+# --- Optional: orjson for faster JSON serialization ---
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- Optional: RE2 for linear-time checklist matching on untrusted issue bodies ---
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 # --- Fix Import Path for 'utils' ---
 project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from utils.github_api import post_github_comment, load_company_profile, extract_vendor_usage_details, parse_form_field
-    from utils.rightbrain_api import get_rb_token, run_rb_task, log, get_task_id_by_name, get_api_root, get_rb_config
+    from utils.github_api import post_github_comment, load_company_profile, extract_vendor_usage_details, scan_issue_body
+    from utils.rightbrain_api import get_rb_token, run_rb_task, log, get_task_id_by_name, get_api_root, get_rb_config, api_root, detect_environment
 except ImportError as e:
     print(f"❌ Error importing 'utils' modules: {e}", file=sys.stderr)
     sys.exit(1)
@@ -24,143 +36,286 @@ except ImportError as e:
 # --- Constants ---
 SOURCE_DIR = Path("_vendor_analysis_source")
 CONFIG_DIR = Path("config")
+MAX_READ_WORKERS = 8
+REQUIRED_ENV_VARS = ("GITHUB_TOKEN", "ISSUE_BODY", "ISSUE_NUMBER", "REPO_NAME")
+# Bound str.format for the header placed before each compiled document
+_SEPARATOR_LINE = "\n\n--- DOCUMENT SEPARATOR ---\nSource URL: {}\n\n".format
+
+# Checked checklist row: captures the category tags and the local source path.
+# Case-insensitivity is inline so the same pattern compiles under re2 and re.
+_APPROVED_DOC_PATTERN = r"(?i)-\s*\[x\]\s*\*\*(.*?)\*\*:.*?\((?:https://[^)]*?/blob/main/)?(_vendor_analysis_source/[^)\s]+)\)"
+_APPROVED_DOC_RE = (re2 or re).compile(_APPROVED_DOC_PATTERN)
+
+# Fast-path tokens for rows as written by discover_documents: "- [x] **Tags**: [`name`](url)"
+_CHECKED_ROW_PREFIXES = ("- [x] **", "- [X] **")
+_SOURCE_PREFIX = "_vendor_analysis_source/"
+_BLOB_MAIN = "/blob/main/"
+
+# Category bits for a checklist row's tags
+_LEGAL = 1
+_SECURITY = 2
 
 # --- Core Logic: Text Compilation & Context ---
 
-def parse_data_processor_field(issue_body: str) -> str:
-    """Parses the 'Data Processor' field from the issue body."""
-    log("info", "Parsing data processor status from issue body...")
-    return parse_form_field(issue_body, 'Data Processor')
+def is_data_processor(fields: Dict[str, str]) -> bool:
+    """True when the parsed issue form answers 'Yes' to 'Data Processor'."""
+    log("info", "Reading data processor status from parsed form fields...")
+    return fields.get('data processor', '').lower() == 'yes'
 
-def parse_approved_documents(issue_body: str) -> Dict[str, Set[str]]:
+@functools.lru_cache(maxsize=32)
+def _category_flags(categories_str: str) -> int:
+    """Maps a row's tag string ("Legal, Security") to _LEGAL/_SECURITY bits; computed once per distinct string."""
+    # Substring tests keep reviewer-edited tags ("Legal/DPA") working without splitting the list
+    categories = categories_str.lower()
+    return (_LEGAL if "legal" in categories else 0) | (_SECURITY if "security" in categories else 0)
+
+def _parse_checked_row(line: str) -> Optional[Tuple[str, str]]:
     """
-    Parses the issue body's checklist to find all checked files
-    and their categories.
+    Plain string scan of one stripped checklist line, equivalent to _APPROVED_DOC_RE
+    for the generated row format. Returns (categories_str, file_path_raw) or None.
     """
-    log("info", "Parsing approved documents from issue checklist...")
-    legal_files: Set[str] = set()
-    security_files: Set[str] = set()
+    if not line.startswith(_CHECKED_ROW_PREFIXES):
+        return None
+    tags_start = len(_CHECKED_ROW_PREFIXES[0])
+    tags_end = line.find("**:", tags_start)
+    if tags_end < 0:
+        return None
     
-    pattern = re.compile(
-        r"-\s*\[x\]\s*\*\*(.*?)\*\*:.*?\((?:https://.*?/blob/main/)?(_vendor_analysis_source/.*?)\)",
-        re.IGNORECASE
-    )
+    # First '(' that opens a source path, optionally behind a .../blob/main/ link
+    paren = line.find("(", tags_end)
+    while paren >= 0:
+        path_start = paren + 1
+        if line.startswith("https://", path_start):
+            close = line.find(")", path_start)
+            blob = line.find(_BLOB_MAIN, path_start, close) if close >= 0 else -1
+            if blob >= 0:
+                path_start = blob + len(_BLOB_MAIN)
+        if line.startswith(_SOURCE_PREFIX, path_start):
+            close = line.find(")", path_start + len(_SOURCE_PREFIX))
+            path = line[path_start:close]
+            if close > path_start + len(_SOURCE_PREFIX) and len(path.split()) == 1:
+                return line[tags_start:tags_end], path
+        paren = line.find("(", paren + 1)
+    return None
+
+def _iter_checked_rows(checklist_text: str) -> Iterator[Tuple[str, str]]:
+    """Yields (categories_str, file_path_raw) per checked row, line by line; the regex only sees rows the fast scan can't parse."""
+    for line in checklist_text.splitlines():
+        if "[x]" not in line and "[X]" not in line:
+            continue
+        row = _parse_checked_row(line.strip())
+        if row is not None:
+            yield row
+        else:
+            for match in _APPROVED_DOC_RE.finditer(line):
+                yield match.group(1), match.group(2)
+
+def parse_approved_documents(checklist_text: str) -> Dict[str, Any]:
+    """
+    Parses the issue's checklist (the issue body, or the checklist_text from
+    scan_issue_body) to find all checked files and their categories.
+    "files" maps each checked path, once and in checklist order, to its
+    _LEGAL/_SECURITY bits; the per-category lists are derived from it.
+    """
+    log("info", "Parsing approved documents from issue checklist...")
+    files: Dict[str, int] = {}
     
-    matches = pattern.findall(issue_body)
+    found = False
+    for categories_str, file_path_raw in _iter_checked_rows(checklist_text):
+        found = True
+        file_path = unquote(file_path_raw) if "%" in file_path_raw else file_path_raw
+        flags = _category_flags(categories_str)
+        if flags:
+            files[file_path] = files.get(file_path, 0) | flags
     
-    if not matches:
+    if not found:
         log("warning", "No checked documents found in the issue body. Analysis may be empty.")
-
-    for categories_str, file_path_raw in matches:
-        file_path = unquote(file_path_raw.strip(')'))
-        categories = [cat.strip().lower() for cat in categories_str.split(',')]
-        
-        if "legal" in categories:
-            legal_files.add(file_path)
-        if "security" in categories:
-            security_files.add(file_path)
+    
+    legal_files = [path for path, flags in files.items() if flags & _LEGAL]
+    security_files = [path for path, flags in files.items() if flags & _SECURITY]
             
     print(f"Found {len(legal_files)} approved legal document(s).")
     print(f"Found {len(security_files)} approved security document(s).")
     
-    return {"legal_files": legal_files, "security_files": security_files}
+    return {"files": files, "legal_files": legal_files, "security_files": security_files}
+
+def _read_one(file_path_str: str) -> Tuple[str, Optional[bytes]]:
+    """Reads one approved file, returning (path, raw bytes) or (path, None) on failure."""
+    file_path = Path(file_path_str)
+    try:
+        return file_path_str, file_path.read_bytes()
+    except FileNotFoundError:
+        log("warning", f"Checked file not found: '{file_path}'. Skipping.")
+        return file_path_str, None
+    except Exception as e:
+        log("warning", f"Error reading file '{file_path}': {e}. Skipping.")
+        return file_path_str, None
 
-def compile_text_from_files(file_list: Set[str]) -> str:
-    """Reads a list of files and compiles them into a single string."""
+def read_source_files(file_list: List[str]) -> Dict[str, bytes]:
+    """Reads each listed file once, returning {path: raw bytes} in the given order; unreadable files are left out."""
     if not file_list:
-        return ""
-        
-    compiled_parts = []
+        return {}
+    
+    # One directory listing instead of a stat per checked file
+    try:
+        existing = {entry.name for entry in os.scandir(SOURCE_DIR)}
+    except FileNotFoundError:
+        existing = set()
     
-    for file_path_str in sorted(list(file_list)):
+    to_read = []
+    for file_path_str in file_list:
         file_path = Path(file_path_str)
-        
-        if not file_path.exists():
+        if file_path.parent == SOURCE_DIR and file_path.name not in existing:
             log("warning", f"Checked file not found: '{file_path}'. Skipping.")
             continue
-            
-        try:
-            content = file_path.read_text(encoding="utf-8")
-            separator = f"\n\n--- DOCUMENT SEPARATOR ---\nSource URL: {file_path_str}\n\n"
-            compiled_parts.append(separator + content)
-            
-        except Exception as e:
-            log("warning", f"Error reading file '{file_path}': {e}. Skipping.")
-            
-    return "".join(compiled_parts)
+        to_read.append(file_path_str)
+    if not to_read:
+        return {}
+        
+    # Reads are I/O-bound, so overlap them; executor.map keeps the input order
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(to_read))) as executor:
+        results = list(executor.map(_read_one, to_read))
+    
+    return {file_path_str: content for file_path_str, content in results if content is not None}
+
+def compile_text_from_files(file_list: List[str], contents: Optional[Dict[str, bytes]] = None) -> str:
+    """
+    Compiles a list of files, in the given order, into a single string.
+    Pass contents from read_source_files to reuse files already read for another category.
+    """
+    if contents is None:
+        contents = read_source_files(file_list)
+    
+    compiled_parts: List[bytes] = []
+    for file_path_str in file_list:
+        content = contents.get(file_path_str)
+        if content is None:
+            continue
+        compiled_parts.extend((_SEPARATOR_LINE(file_path_str).encode("utf-8"), content))
+    
+    # Join the raw bytes once and decode once, instead of a str per file plus a str join
+    return b"".join(compiled_parts).decode("utf-8", errors="replace")
+
+# --- Helper: JSON Serialization ---
+
+def _dumps_pretty(obj: Any) -> str:
+    """2-space indented JSON for display; orjson when installed, same text from the stdlib fallback."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def _dumps(obj: Any) -> str:
+    """Compact JSON (insertion order preserved) for embedding in task inputs."""
+    if orjson:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
 
 # --- Helper: Report Formatting ---
 
+# Bound str.format per line template; missing or empty values render as 'N/A'
+_FINDING_LINE = "* **{0}:** {1}".format
+_RISK_LINE = "* **Risk:** {0}\n  * **Summary:** {1}\n  * **Recommendation:** {2}".format
+_GAP_LINE = "* **Gap:** {0}\n  * **Summary:** {1}\n  * **Recommendation:** {2}".format
+
+# Status icons; assessment keys are matched as substrings in this order, media keys exactly
+_ASSESSMENT_ICON = {"Low": "🟢", "Medium": "🟡", "High": "🔴"}
+_MEDIA_ICON = {"LOW": "🟢", "MEDIUM": "🟡", "HIGH": "🔴"}
+
+# Full risk-summary comment; filled with str.format_map in format_report_as_markdown
+_REPORT_TEMPLATE = (
+    "## {status_icon} AI-Generated Risk Summary\n"
+    "### **Overall Assessment: {assessment}**\n"
+    "**Executive Summary:** {executive_summary}\n"
+    "\n### ✅ Positive Findings\n"
+    "{pos_findings_md}"
+    "\n\n### ⚖️ Key Legal Risks\n"
+    "{legal_risks_md}"
+    "\n\n### 🛡️ Key Security Gaps\n"
+    "{sec_gaps_md}"
+    "\n\n{media_section}\n"
+    "\n---\n"
+    "\n## 📝 Reviewer-Approved Data (Draft)\n"
+    "Please review, edit, and confirm the details below. This JSON block will be committed to the central vendor registry upon issue closure.\n"
+    "\n**ACTION REQUIRED:** Before closing this issue, please **edit the `mitigations` field** (and any others) in the JSON block below to reflect the final, agreed-upon controls.\n"
+    "```json\n{draft_pretty}\n```\n"
+    "\n---\n"
+    "\n## 🤖 Raw Analysis Data (for review)\n"
+    "<details><summary>🛡️ Security Posture Analysis (Raw)</summary>\n"
+    "```json\n{security_pretty}\n```\n</details>\n"
+    "<details><summary>⚖️ Legal & DPA Analysis (Raw)</summary>\n"
+    "```json\n{legal_pretty}\n```\n</details>\n"
+    "<details><summary>📰 Adverse Media Analysis (Raw)</summary>\n"
+    "```json\n{media_pretty}\n```\n</details>"
+)
+
+# Posted instead of a risk report when there is nothing to synthesize; deliberately has no draft block to commit
+_INSUFFICIENT_DATA_COMMENT = (
+    "## ⚪ Insufficient Data for a Risk Summary\n"
+    "No approved documents were found for **{vendor_name}** and the adverse media check returned no findings, "
+    "so the risk report was not generated.\n\n"
+    "Tick the relevant documents in the checklist above (or add them via a comment) and re-run the analysis.\n\n"
+    "<details><summary>📰 Adverse Media Analysis (Raw)</summary>\n\n"
+    "```json\n{media_pretty}\n```\n</details>"
+).format
+
 def format_report_as_markdown(report_data: Dict[str, Any], 
-                            raw_security_json: Dict[str, Any], 
-                            raw_legal_json: Dict[str, Any],
-                            raw_media_json: Dict[str, Any]) -> str:
-    """Formats the synthesis task's JSON into a human-readable Markdown comment."""
-    
+                            security_pretty: str, 
+                            legal_pretty: str,
+                            media_pretty: str) -> str:
+    """
+    Formats the synthesis task's JSON into a human-readable Markdown comment.
+    The raw analyses are passed in already pretty-printed (see _dumps_pretty).
+    """
     try:
         report = report_data.get("report", {})
         draft_data = report_data.get("draft_approval_data", {})
         
         # Determine Status Icon based on overall assessment
         assessment = report.get('overall_assessment', 'Unknown')
-        status_icon = "🟢" if "Low" in assessment else "aaa" if "Medium" in assessment else "🔴"
+        status_icon = next((icon for level, icon in _ASSESSMENT_ICON.items() if level in assessment), "🔴")
 
         # Build positive findings
-        pos_findings_md_list = []
-        for f in report.get("positive_findings", []):
-            pos_findings_md_list.append(f"* **{f.get('finding', 'N/A')}:** {f.get('summary', 'N/A')}")
-        pos_findings_md = "\n".join(pos_findings_md_list) or "None identified."
+        pos_findings_md = "\n".join(
+            _FINDING_LINE(f.get("finding") or "N/A", f.get("summary") or "N/A")
+            for f in report.get("positive_findings", [])
+        ) or "None identified."
 
         # Build legal risks
-        legal_risks_md_list = []
-        for r in report.get("key_legal_risks", []):
-            legal_risks_md_list.append(f"* **Risk:** {r.get('risk', 'N/A')}\n  * **Summary:** {r.get('summary', 'N/A')}\n  * **Recommendation:** {r.get('recommendation', 'N/A')}")
-        legal_risks_md = "\n".join(legal_risks_md_list) or "No critical legal risks identified."
+        legal_risks_md = "\n".join(
+            _RISK_LINE(r.get("risk") or "N/A", r.get("summary") or "N/A", r.get("recommendation") or "N/A")
+            for r in report.get("key_legal_risks", [])
+        ) or "No critical legal risks identified."
 
         # Build security gaps
-        sec_gaps_md_list = []
-        for g in report.get("key_security_gaps", []):
-            sec_gaps_md_list.append(f"* **Gap:** {g.get('gap', 'N/A')}\n  * **Summary:** {g.get('summary', 'N/A')}\n  * **Recommendation:** {g.get('recommendation', 'N/A')}")
-        sec_gaps_md = "\n".join(sec_gaps_md_list) or "No critical security gaps identified."
+        sec_gaps_md = "\n".join(
+            _GAP_LINE(g.get("gap") or "N/A", g.get("summary") or "N/A", g.get("recommendation") or "N/A")
+            for g in report.get("key_security_gaps", [])
+        ) or "No critical security gaps identified."
 
         # Build Adverse Media Summary
         media_summary = report.get("adverse_media_summary", {})
         media_risk = media_summary.get("risk_level", "Unknown")
         media_text = media_summary.get("key_findings_summary", "No adverse media analysis available.")
         
-        media_icon = "🟢" if media_risk == "LOW" else "aaa" if media_risk == "MEDIUM" else "🔴"
+        media_icon = _MEDIA_ICON.get(media_risk, "🔴")
         media_section = f"### {media_icon} Reputation & Adverse Media: {media_risk}\n{media_text}"
 
-        # Build the final comment
-        comment_parts = [
-            f"## {status_icon} AI-Generated Risk Summary",
-            f"### **Overall Assessment: {assessment}**",
-            f"**Executive Summary:** {report.get('executive_summary', 'N/A')}",
-            "\n### ✅ Positive Findings",
-            pos_findings_md,
-            "\n### ⚖️ Key Legal Risks",
-            legal_risks_md,
-            "\n### 🛡️ Key Security Gaps",
-            sec_gaps_md,
-            f"\n{media_section}",
-            "\n---",
-            "\n## 📝 Reviewer-Approved Data (Draft)",
-            "Please review, edit, and confirm the details below. This JSON block will be committed to the central vendor registry upon issue closure.",
-            "\n**ACTION REQUIRED:** Before closing this issue, please **edit the `mitigations` field** (and any others) in the JSON block below to reflect the final, agreed-upon controls.",
-            f"```json\n{json.dumps(draft_data, indent=2)}\n```",
-            "\n---",
-            "\n## 🤖 Raw Analysis Data (for review)",
-            "<details><summary>🛡️ Security Posture Analysis (Raw)</summary>",
-            f"```json\n{json.dumps(raw_security_json, indent=2)}\n```",
-            "</details>",
-            "<details><summary>⚖️ Legal & DPA Analysis (Raw)</summary>",
-            f"```json\n{json.dumps(raw_legal_json, indent=2)}\n```",
-            "</details>",
-            "<details><summary>📰 Adverse Media Analysis (Raw)</summary>",
-            f"```json\n{json.dumps(raw_media_json, indent=2)}\n```",
-            "</details>"
-        ]
-        return "\n".join(comment_parts)
+        draft_pretty = _dumps_pretty(draft_data)
+
+        # Fill the comment template in one pass
+        return _REPORT_TEMPLATE.format_map({
+            "status_icon": status_icon,
+            "assessment": assessment,
+            "executive_summary": report.get('executive_summary', 'N/A'),
+            "pos_findings_md": pos_findings_md,
+            "legal_risks_md": legal_risks_md,
+            "sec_gaps_md": sec_gaps_md,
+            "media_section": media_section,
+            "draft_pretty": draft_pretty,
+            "security_pretty": security_pretty,
+            "legal_pretty": legal_pretty,
+            "media_pretty": media_pretty,
+        })
         
     except Exception as e:
         log("error", "Failed to format report", details=str(e))
@@ -168,7 +323,13 @@ def format_report_as_markdown(report_data: Dict[str, Any],
             "## 🤖 Vendor Analysis Results (Fallback)\n\n"
             "Error formatting the AI-generated report. Please review the raw JSON outputs.\n\n"
             "### 📊 Synthesis Report\n"
-            f"```json\n{json.dumps(report_data, indent=2)}\n```"
+            f"```json\n{_dumps_pretty(report_data)}\n```\n"
+            "### 🛡️ Security Posture Analysis (Raw)\n"
+            f"```json\n{security_pretty}\n```\n"
+            "### ⚖️ Legal & DPA Analysis (Raw)\n"
+            f"```json\n{legal_pretty}\n```\n"
+            "### 📰 Adverse Media Analysis (Raw)\n"
+            f"```json\n{media_pretty}\n```"
         )
 
 # --- Main Execution ---
@@ -177,58 +338,56 @@ def main():
     # Load .env file from project root if it exists
     env_path = project_root / ".env"
     if env_path.exists():
+        from dotenv import load_dotenv
         load_dotenv(env_path)
 
     # --- 1. Load Config & Environment Variables ---
-    gh_token = os.environ.get("GITHUB_TOKEN")
-    issue_body = os.environ.get("ISSUE_BODY")
-    issue_number = os.environ.get("ISSUE_NUMBER")
-    repo_name = os.environ.get("REPO_NAME")
+    missing = [name for name in REQUIRED_ENV_VARS if not os.environ.get(name)]
+    if missing:
+        sys.exit(f"❌ Error: Missing required environment variables: {', '.join(missing)}")
+
+    gh_token = os.environ["GITHUB_TOKEN"]
+    issue_body = os.environ["ISSUE_BODY"]
+    issue_number = os.environ["ISSUE_NUMBER"]
+    repo_name = os.environ["REPO_NAME"]
     
     get_rb_config()
     rb_api_root = get_api_root()
 
-    if not all([gh_token, issue_body, issue_number, repo_name]):
-        sys.exit("❌ Error: Missing one or more required environment variables.")
-    
-    # Temporarily set API_ROOT
-    original_api_root = os.environ.get("API_ROOT")
-    os.environ["API_ROOT"] = rb_api_root
-
     print(f"🚀 Starting analysis for issue #{issue_number} in repo {repo_name}...")
 
-    # Look up task IDs by name
-    security_task_id = get_task_id_by_name("Vendor Security Posture Analyzer")
-    legal_task_id = get_task_id_by_name("Sub-Processor Terms Analyzer")
-    reporter_task_id = get_task_id_by_name("Vendor Risk Reporter")
-    media_task_id = get_task_id_by_name("Adverse Media Screener") # New Task
-    
-    if original_api_root:
-        os.environ["API_ROOT"] = original_api_root
-    elif "API_ROOT" in os.environ:
-        del os.environ["API_ROOT"]
+    # Look up task IDs by name; the environment is detected once under the resolved API root
+    with api_root(rb_api_root):
+        environment = detect_environment()
+        security_task_id = get_task_id_by_name("Vendor Security Posture Analyzer", environment)
+        legal_task_id = get_task_id_by_name("Sub-Processor Terms Analyzer", environment)
+        reporter_task_id = get_task_id_by_name("Vendor Risk Reporter", environment)
+        media_task_id = get_task_id_by_name("Adverse Media Screener", environment) # New Task
 
     if not all([security_task_id, legal_task_id, reporter_task_id, media_task_id]):
         sys.exit("❌ Error: Could not find all required task IDs in manifest.")
 
     # --- 2. Build Context Blocks ---
     company_profile = load_company_profile()
-    vendor_usage_details = extract_vendor_usage_details(issue_body)
-    relationship_owner = parse_form_field(issue_body, 'Internal Contact')
+    # One walk of the body yields both the form answers and the checklist sections
+    fields, checklist_text = scan_issue_body(issue_body)
+    vendor_usage_details = extract_vendor_usage_details(issue_body, fields)
+    relationship_owner = fields.get('internal contact', 'N/A')
     
     # NEW: Extract Vendor Name early for Adverse Media check
-    vendor_name = parse_form_field(issue_body, 'Supplier Name')
+    vendor_name = fields.get('supplier name', 'N/A')
     if not vendor_name:
         vendor_name = "Unknown Vendor"
 
     # --- 3. Determine Vendor Type Signal ---
-    data_processor_status = parse_data_processor_field(issue_body)
-    vendor_type_signal = "Processor" if data_processor_status.lower() == 'yes' else "General Supplier"
+    vendor_type_signal = "Processor" if is_data_processor(fields) else "General Supplier"
 
     # --- 4. Parse Checklist and Compile Text ---
-    approved_files = parse_approved_documents(issue_body)
-    legal_docs_text = compile_text_from_files(approved_files["legal_files"])
-    security_docs_text = compile_text_from_files(approved_files["security_files"])
+    approved_files = parse_approved_documents(checklist_text)
+    # Read every checked file once; documents tagged both Legal and Security feed both texts
+    source_contents = read_source_files(list(approved_files["files"]))
+    legal_docs_text = compile_text_from_files(approved_files["legal_files"], source_contents)
+    security_docs_text = compile_text_from_files(approved_files["security_files"], source_contents)
 
     if not legal_docs_text and not security_docs_text:
         log("warning", "No documents compiled. Analysis will rely primarily on Adverse Media checks.")
@@ -242,52 +401,79 @@ def main():
     security_analysis_json = {"status": "skipped", "reason": "No approved security documents found."}
     media_analysis_json = {"status": "skipped", "reason": "Task execution failed"}
 
-    # A. Legal Analysis
-    if legal_docs_text:
-        legal_input = {
-            "company_profile": company_profile,
-            "vendor_usage_details": vendor_usage_details,
-            "consolidated_text": legal_docs_text
-        }
-        legal_run = run_rb_task(rb_token, legal_task_id, legal_input, "Sub-Processor Terms Analyzer")
-        legal_analysis_json = legal_run.get("response", {}) or legal_analysis_json
-
-    # B. Security Analysis
-    if security_docs_text:
-        security_input = {
-            "company_profile": company_profile,
-            "vendor_usage_details": vendor_usage_details,
-            "consolidated_text": security_docs_text
-        }
-        sec_run = run_rb_task(rb_token, security_task_id, security_input, "Security Posture Analyzer")
-        security_analysis_json = sec_run.get("response", {}) or security_analysis_json
-
-    # C. Adverse Media Analysis (New)
-    print(f"🕵️‍♂️ Running Adverse Media Check for: {vendor_name}")
-    media_input = {"vendor": vendor_name}
-    media_run = run_rb_task(rb_token, media_task_id, media_input, "Adverse Media Screener")
-    media_analysis_json = media_run.get("response", {}) or media_analysis_json
+    # A, B & C. Legal, Security and Adverse Media share no data, so run them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        legal_future = None
+        if legal_docs_text:
+            legal_input = {
+                "company_profile": company_profile,
+                "vendor_usage_details": vendor_usage_details,
+                "consolidated_text": legal_docs_text
+            }
+            legal_future = executor.submit(run_rb_task, rb_token, legal_task_id, legal_input, "Sub-Processor Terms Analyzer")
+
+        security_future = None
+        if security_docs_text:
+            security_input = {
+                "company_profile": company_profile,
+                "vendor_usage_details": vendor_usage_details,
+                "consolidated_text": security_docs_text
+            }
+            security_future = executor.submit(run_rb_task, rb_token, security_task_id, security_input, "Security Posture Analyzer")
+
+        print(f"🕵️‍♂️ Running Adverse Media Check for: {vendor_name}")
+        media_input = {"vendor": vendor_name}
+        media_future = executor.submit(run_rb_task, rb_token, media_task_id, media_input, "Adverse Media Screener")
+
+        if legal_future:
+            legal_run = legal_future.result()
+            legal_analysis_json = legal_run.get("response", {}) or legal_analysis_json
+        if security_future:
+            sec_run = security_future.result()
+            security_analysis_json = sec_run.get("response", {}) or security_analysis_json
+        media_run = media_future.result()
+        media_analysis_json = media_run.get("response", {}) or media_analysis_json
 
     # --- 6. Run Synthesis Task ---
     print("\n--- STAGE 6: Synthesizing Reports ---")
     
+    # Skip the reporter only when the screener actually ran and found nothing; a failed run is not "no findings"
+    media_findings = media_analysis_json.get("findings") if isinstance(media_analysis_json, dict) else None
+    if (not legal_docs_text and not security_docs_text
+            and not media_run.get("is_error") and isinstance(media_findings, list) and not media_findings):
+        log("warning", "No documents and no adverse media findings. Skipping synthesis task.")
+        try:
+            post_github_comment(repo_name, issue_number, _INSUFFICIENT_DATA_COMMENT(
+                vendor_name=vendor_name,
+                media_pretty=_dumps_pretty(media_analysis_json),
+            ))
+        except Exception as e:
+            log("error", "CRITICAL: Failed to post final comment to GitHub", details=str(e))
+        log("success", "Analysis complete (insufficient data for a risk report).")
+        return
+
     reporter_input = {
         "company_profile": company_profile,
         "vendor_usage_details": vendor_usage_details,
         "vendor_type_signal": vendor_type_signal,
-        "security_json_string": json.dumps(security_analysis_json),
-        "legal_json_string": json.dumps(legal_analysis_json),
-        "adverse_media_json_string": json.dumps(media_analysis_json) # Passed to reporter
+        "security_json_string": _dumps(security_analysis_json),
+        "legal_json_string": _dumps(legal_analysis_json),
+        "adverse_media_json_string": _dumps(media_analysis_json) # Passed to reporter
     }
 
     report_run = run_rb_task(rb_token, reporter_task_id, reporter_input, "Vendor Risk Reporter")
     report_json = report_run.get("response", {})
 
+    # Display copies of the raw analyses, serialized once for either comment path
+    security_pretty = _dumps_pretty(security_analysis_json)
+    legal_pretty = _dumps_pretty(legal_analysis_json)
+    media_pretty = _dumps_pretty(media_analysis_json)
+
     # --- 7. Format and Post Results ---
     print("\n--- STAGE 7: Formatting and Posting Results ---")
     if not report_json or report_run.get("is_error"):
         log("error", "Synthesis task failed. Posting raw JSON as fallback.")
-        final_comment_body = format_report_as_markdown({}, security_analysis_json, legal_analysis_json, media_analysis_json)
+        final_comment_body = format_report_as_markdown({}, security_pretty, legal_pretty, media_pretty)
     else:
         log("success", "Synthesis complete. Injecting local data.")
         
@@ -297,7 +483,7 @@ def main():
         draft = report_json["draft_approval_data"]
         draft["relationship_owner"] = relationship_owner
         draft["processor_name"] = vendor_name
-        draft["service_description"] = parse_form_field(issue_body, 'Service Description')
+        draft["service_description"] = fields.get('service description', 'N/A')
         draft["data_processing_status"] = vendor_type_signal
         draft["risk_rating"] = report_json.get("report", {}).get("overall_assessment", "Unknown")
         
@@ -308,7 +494,7 @@ def main():
         draft["termination_notice"] = term_notice
 
         final_comment_body = format_report_as_markdown(
-            report_json, security_analysis_json, legal_analysis_json, media_analysis_json
+            report_json, security_pretty, legal_pretty, media_pretty
         )
     
     try:
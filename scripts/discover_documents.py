@@ -2,13 +2,12 @@ import os
 import sys
 import json
 import re
-import requests
 import subprocess
 import io
-from dotenv import load_dotenv
+import functools
 from pathlib import Path
-from typing import List, Dict, Any, Set
-from urllib.parse import quote as url_quote
+from typing import List, Dict, Any, Set, Optional
+from urllib.parse import quote as url_quote, unquote
 
 # --- Import pypdf ---
 try:
@@ -24,7 +23,7 @@ if str(project_root) not in sys.path:
 
 try:
     from utils.github_api import update_issue_body, post_failure_and_exit, fetch_issue_comments, parse_form_field
-    from utils.rightbrain_api import get_rb_token, run_rb_task, log, get_task_id_by_name, get_api_root, get_rb_config
+    from utils.rightbrain_api import get_rb_token, run_rb_task, log, get_task_id_by_name, get_api_root, get_rb_config, api_root, SESSION
 except ImportError as e:
     print(f"❌ Error importing 'utils' modules: {e}", file=sys.stderr)
     sys.exit(1)
@@ -33,12 +32,16 @@ except ImportError as e:
 # 1. HELPER FUNCTIONS
 # ==========================================
 
+_UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*\s]+')
+_ATTACHMENT_URL_RE = re.compile(r'(https://github\.com/.*?/files/\d+/[^\s)]+)')
+_MANUAL_PASTE_RE = re.compile(r'### Manual Document:\s*(.*?)\n(.*?)(?=\n###|\Z)', re.DOTALL | re.IGNORECASE)
+
 def create_safe_filename(doc_name: str, supplier_name: str, issue_number: str, extension: str = ".txt") -> str:
     """
     Creates a standardized filename: issue-{IssueID}-{Supplier}-{DocName}.txt
     """
-    safe_supplier = re.sub(r'[<>:"/\\|?*\s]+', '_', supplier_name).strip('._ ') or "Vendor"
-    safe_doc = re.sub(r'[<>:"/\\|?*\s]+', '_', doc_name).strip('._ ') or "doc"
+    safe_supplier = _UNSAFE_FILENAME_RE.sub('_', supplier_name).strip('._ ') or "Vendor"
+    safe_doc = _UNSAFE_FILENAME_RE.sub('_', doc_name).strip('._ ') or "doc"
     
     # Truncate components to avoid filesystem limits
     safe_supplier = safe_supplier[:30]
@@ -49,20 +52,26 @@ def create_safe_filename(doc_name: str, supplier_name: str, issue_number: str, e
         
     return f"issue-{issue_number}-{safe_supplier}-{safe_doc}"
 
+_URL_PATTERN = re.compile(r'(https?://[^\s,]+)')
+
+@functools.lru_cache(maxsize=16)
+def _url_block_pattern(label: str) -> re.Pattern:
+    """Compiles (and escapes) the section pattern for a URL field label once per label."""
+    return re.compile(rf"### {re.escape(label)}\s*(.*?)(?=\n###|\Z)", re.DOTALL | re.IGNORECASE)
+
 def parse_multiline_urls(issue_body: str, label: str) -> List[str]:
-    pattern = re.compile(f"### {re.escape(label)}\s*(.*?)(?=\\n###|\\Z)", re.DOTALL | re.IGNORECASE)
-    match = pattern.search(issue_body)
+    match = _url_block_pattern(label).search(issue_body)
     if not match: return []
     
     raw_block = match.group(1)
-    urls = re.findall(r'(https?://[^\s,]+)', raw_block)
+    urls = _URL_PATTERN.findall(raw_block)
     
-    clean_urls = []
+    clean_urls: Dict[str, None] = {}  # ordered de-duplication
     for u in urls:
         u = u.strip(').,')
         if "github.com" in u and "/files/" in u: continue
-        clean_urls.append(u)
-    return list(set(clean_urls))
+        clean_urls[u] = None
+    return list(clean_urls)
 
 def extract_text_from_pdf_bytes(file_content: bytes) -> str:
     if not PdfReader: return "[Error: pypdf not installed]"
@@ -84,71 +93,94 @@ def scan_comments_for_inputs(repo_name: str, issue_number: str, gh_token: str) -
     headers = {"Authorization": f"token {gh_token}"}
     print(f"🔎 Scanning {len(comments)} comments...")
 
-    url_pattern = re.compile(r'(https://github\.com/.*?/files/\d+/[^\s)]+)')
-    paste_pattern = re.compile(r'### Manual Document:\s*(.*?)\n(.*?)(?=\n###|\Z)', re.DOTALL | re.IGNORECASE)
-
     for comment in comments:
         body = comment.get("body", "")
         # Attachments
-        for url in url_pattern.findall(body):
+        for url in _ATTACHMENT_URL_RE.findall(body):
             url = url.rstrip(').')
-            from urllib.parse import unquote
             filename = unquote(url.split('/')[-1])
             ext = os.path.splitext(filename)[1].lower()
             if ext not in ['.pdf', '.txt', '.md']: continue
             
             print(f"  📎 Found attachment: {filename}")
             try:
-                resp = requests.get(url, headers=headers)
+                resp = SESSION.get(url, headers=headers)
                 resp.raise_for_status()
                 content = extract_text_from_pdf_bytes(resp.content) if ext == '.pdf' else resp.content.decode('utf-8')
                 found_inputs.append({"type": "attachment", "name": filename, "url": url, "text": content})
             except Exception as e: print(f"  ❌ Download Error: {e}")
 
         # Manual Pastes
-        for doc_name, doc_content in paste_pattern.findall(body):
+        for doc_name, doc_content in _MANUAL_PASTE_RE.findall(body):
             print(f"  📋 Found manual paste: {doc_name.strip()}")
             found_inputs.append({"type": "paste", "name": doc_name.strip(), "url": "N/A", "text": doc_content.strip()})
 
     return found_inputs
 
-def save_and_commit_source_text(text: str, repo_name: str, issue_number: str, filename: str):
+def save_source_text(text: str, filename: str) -> Optional[Path]:
+    """Writes one source text to _vendor_analysis_source/. Returns the path, or None if nothing was written."""
     source_dir = Path("_vendor_analysis_source")
     source_dir.mkdir(exist_ok=True)
     file_path = source_dir / filename
 
-    if not text or not text.strip(): return
+    if not text or not text.strip(): return None
 
     try:
         with open(file_path, "w", encoding="utf-8") as f: f.write(text)
     except IOError as e:
         log("error", f"Failed to write {file_path}", details=str(e))
+        return None
+    return file_path
+
+def commit_and_push_all(paths: List[Path], repo_name: str, issue_number: str):
+    """Commits every saved source text in one commit and pushes once, instead of a commit/pull/push per file."""
+    existing = [p for p in paths if p.exists()]
+    for p in paths:
+        if p not in existing: log("warning", f"Saved source vanished before commit: {p}")
+    if not existing: return
+
+    subprocess.run(["git", "config", "--global", "user.name", "github-actions[bot]"], capture_output=True)
+    subprocess.run(["git", "config", "--global", "user.email", "github-actions[bot]@users.noreply.github.com"], capture_output=True)
+
+    # Stage the batch in one call; if that fails, stage file by file so one bad path doesn't sink the rest
+    staged = existing
+    add = subprocess.run(["git", "add", "--", *map(str, existing)], capture_output=True, text=True)
+    if add.returncode != 0:
+        staged = []
+        for p in existing:
+            one = subprocess.run(["git", "add", "--", str(p)], capture_output=True, text=True)
+            if one.returncode == 0: staged.append(p)
+            else: log("error", f"Git add failed for '{p.name}'", details=one.stderr.strip())
+    if not staged: return
+    names = ", ".join(p.name for p in staged)
+
+    status = subprocess.run(["git", "status", "--porcelain", "--", *map(str, staged)], capture_output=True, text=True)
+    changed = [line for line in status.stdout.splitlines() if line.strip()]
+    if not changed:
+        print(f"  ℹ️  Up-to-date: {len(staged)} source file(s)")
         return
 
-    try:
-        subprocess.run(["git", "config", "--global", "user.name", "github-actions[bot]"], capture_output=True)
-        subprocess.run(["git", "config", "--global", "user.email", "github-actions[bot]@users.noreply.github.com"], capture_output=True)
-        subprocess.run(["git", "add", str(file_path)], check=True, capture_output=True)
-        
-        status = subprocess.run(["git", "status", "--porcelain", str(file_path)], capture_output=True, text=True)
-        if file_path.name in status.stdout:
-            clean_name = filename.replace(f"issue-{issue_number}-", "")
-            msg = f"docs(vendor): Add source '{clean_name}' (#{issue_number})"
-            subprocess.run(["git", "commit", "-m", msg], capture_output=True)
-            subprocess.run(["git", "pull", "--rebase"], capture_output=True)
-            subprocess.run(["git", "push"], check=True, capture_output=True)
-            print(f"  🚀 Committed: {filename}")
-        else: print(f"  ℹ️  Up-to-date: {filename}")
-    except Exception as e: log("warning", f"Git failed for '{filename}'", details=str(e))
+    msg = f"docs(vendor): Add {len(changed)} source text(s) (#{issue_number})"
+    commit = subprocess.run(["git", "commit", "-m", msg], capture_output=True, text=True)
+    if commit.returncode != 0:
+        log("error", f"Git commit failed for: {names}", details=(commit.stderr or commit.stdout).strip())
+        return
+    subprocess.run(["git", "pull", "--rebase"], capture_output=True)
+    push = subprocess.run(["git", "push"], capture_output=True, text=True)
+    if push.returncode != 0:
+        log("error", f"Git push failed for: {names}", details=push.stderr.strip())
+        return
+    print(f"  🚀 Committed {len(changed)} source file(s): {names}")
 
 def extract_text_from_run_data(full_task_run: Dict[str, Any]) -> str:
     try: return full_task_run.get("run_data", {}).get("submitted", {}).get("document_url", "") or ""
     except Exception: return ""
 
+_CHECKLIST_ROW_RE = re.compile(r"-\s*\[(?:x| )\]\s*\*\*(.*?)\*\*:.*?(?:_vendor_analysis_source/)(.*?)\)", re.IGNORECASE)
+
 def extract_previous_categories(issue_body: str) -> Dict[str, List[str]]:
-    regex = r"-\s*\[(?:x| )\]\s*\*\*(.*?)\*\*:.*?(?:_vendor_analysis_source/)(.*?)\)"
     mapping = {}
-    matches = re.findall(regex, issue_body, re.IGNORECASE)
+    matches = _CHECKLIST_ROW_RE.findall(issue_body)
     
     for cats_str, filename in matches:
         cats = [c.strip().lower() for c in cats_str.split(',')]
@@ -197,11 +229,11 @@ def format_documents_as_checklist(all_docs: List[Dict[str, Any]], repo_name: str
             type_note = "Attachment" if doc.get("source_type") == "attachment" else "Paste"
             manual.append(f"{line} ({type_note})")
 
-    output = ""
-    if online: output += "### 🌐 Scraped Documents\n" + "\n".join(online) + "\n\n"
-    if existing: output += "### 🗄️ Existing / Restored Files\n" + "\n".join(existing) + "\n\n"
-    if manual: output += "### 📎 Manual Uploads\n" + "\n".join(manual) + "\n\n"
-    return output
+    sections = []
+    if online: sections.append("### 🌐 Scraped Documents\n" + "\n".join(online) + "\n\n")
+    if existing: sections.append("### 🗄️ Existing / Restored Files\n" + "\n".join(existing) + "\n\n")
+    if manual: sections.append("### 📎 Manual Uploads\n" + "\n".join(manual) + "\n\n")
+    return "".join(sections)
 
 # ==========================================
 # 2. MAIN EXECUTION
@@ -209,7 +241,9 @@ def format_documents_as_checklist(all_docs: List[Dict[str, Any]], repo_name: str
 
 def main():
     env_path = project_root / ".env"
-    if env_path.exists(): load_dotenv(env_path)
+    if env_path.exists():
+        from dotenv import load_dotenv
+        load_dotenv(env_path)
 
     gh_token = os.environ["GITHUB_TOKEN"]
     issue_body = os.environ["ISSUE_BODY"]
@@ -219,14 +253,9 @@ def main():
     get_rb_config()
     rb_api_root = get_api_root()
     
-    orig_root = os.environ.get("API_ROOT")
-    os.environ["API_ROOT"] = rb_api_root
-    
-    discovery_task_id = get_task_id_by_name("Document Discovery Task")
-    classifier_task_id = get_task_id_by_name("Document Classifier Task")
-    
-    if orig_root: os.environ["API_ROOT"] = orig_root
-    elif "API_ROOT" in os.environ: del os.environ["API_ROOT"]
+    with api_root(rb_api_root):
+        discovery_task_id = get_task_id_by_name("Document Discovery Task")
+        classifier_task_id = get_task_id_by_name("Document Classifier Task")
 
     if not discovery_task_id or not classifier_task_id:
         sys.exit("❌ Missing Task IDs in manifest.")
@@ -290,6 +319,7 @@ def main():
     unique_urls = {item['url']: item for item in urls_to_process}.values()
     all_final_docs = []
     processed_filenames = set()
+    saved_paths: List[Path] = []
 
     print(f"\n--- STAGE 3: Fetching {len(unique_urls)} Unique URLs ---")
 
@@ -318,7 +348,8 @@ def main():
                 all_final_docs.append({"name": "Failed Fetch: " + doc_name, "url": url, "source_type": "fetched", "relevance": "irrelevant", "categories": ["fetch_failed"], "filename": safe_filename})
                 continue
 
-            save_and_commit_source_text(text, repo_name, issue_number, safe_filename)
+            saved = save_source_text(text, safe_filename)
+            if saved: saved_paths.append(saved)
             all_final_docs.append({"name": doc_name, "url": url, "source_type": "fetched", "relevance": "relevant", "categories": categories, "filename": safe_filename})
         else:
             log("warning", f"Fetch failed for {url}")
@@ -351,9 +382,13 @@ def main():
         else:
             log("warning", f"Classification failed for {inp['name']}, saving as 'uploaded'")
 
-        save_and_commit_source_text(inp['text'], repo_name, issue_number, safe_filename)
+        saved = save_source_text(inp['text'], safe_filename)
+        if saved: saved_paths.append(saved)
         all_final_docs.append({"name": inp['name'], "url": inp['url'], "source_type": inp['type'], "relevance": "relevant", "categories": categories, "filename": safe_filename})
 
+    # Push every new source text in one commit, before the checklist links to them
+    commit_and_push_all(saved_paths, repo_name, issue_number)
+
     # STAGE 4.5: RECONCILE WITH DISK
     print(f"\n--- STAGE 4.5: Reconciling with Local Files ---")
     source_dir = Path("_vendor_analysis_source")
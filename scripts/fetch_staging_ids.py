@@ -3,7 +3,6 @@ import sys
 import json
 import requests
 from pathlib import Path
-from dotenv import load_dotenv
 from typing import Dict, Any, List
 
 # --- Fix Import Path for 'utils' ---
@@ -15,7 +14,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from utils.rightbrain_api import get_rb_token, log, load_rb_config, _get_base_url
+    from utils.rightbrain_api import get_rb_token, log, load_rb_config, _get_base_url, SESSION
 except ImportError as e:
     print(f"❌ Error importing 'utils.rightbrain_api': {e}", file=sys.stderr)
     sys.exit(1)
@@ -37,7 +36,7 @@ def get_all_tasks(rb_token: str, api_root: str, org_id: str, project_id: str) ->
     
     log("info", f"Fetching tasks from {tasks_url}...")
     try:
-        response = requests.get(tasks_url, headers=headers)
+        response = SESSION.get(tasks_url, headers=headers)
         response.raise_for_status()
         tasks_response = response.json()
         
@@ -55,7 +54,7 @@ def get_all_tasks(rb_token: str, api_root: str, org_id: str, project_id: str) ->
                 tasks_list = []
                 for task_id in tasks_response:
                     task_url = f"{base}/org/{org_id}/project/{project_id}/task/{task_id}"
-                    task_response = requests.get(task_url, headers=headers)
+                    task_response = SESSION.get(task_url, headers=headers)
                     task_response.raise_for_status()
                     task_data = task_response.json()
                     tasks_list.append(task_data)
@@ -99,7 +98,7 @@ def get_all_models(rb_token: str, api_root: str, org_id: str, project_id: str) -
     
     log("info", f"Fetching models from {models_url}...")
     try:
-        response = requests.get(models_url, headers=headers)
+        response = SESSION.get(models_url, headers=headers)
         response.raise_for_status()
         models_list = response.json()
         log("success", f"Found {len(models_list)} models.")
@@ -277,6 +276,7 @@ def main():
     log("debug", f"Looking for .env file at: {env_path}")
     if env_path.exists():
         log("info", f"Loading .env file from {env_path}")
+        from dotenv import load_dotenv
         load_dotenv(env_path)
     else:
         log("info", f"No .env file found at {env_path}, using environment variables only")
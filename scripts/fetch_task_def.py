@@ -11,7 +11,8 @@ from utils.rightbrain_api import (
     get_api_root, 
     get_project_path,
     _get_api_headers,
-    log
+    log,
+    SESSION
 )
 
 # --- Helper Functions ---
@@ -94,7 +95,7 @@ def fetch_task_definition(rb_token: str, task_id: str) -> dict:
         headers = _get_api_headers(rb_token)
         
         log("debug", f"Fetch URL: {fetch_url}")
-        response = requests.get(fetch_url, headers=headers)
+        response = SESSION.get(fetch_url, headers=headers)
         response.raise_for_status()
         log("success", "Full task definition fetched successfully.")
         return response.json()
@@ -1,4 +1,3 @@
-import os
 import sys
 import json
 import requests
@@ -22,7 +21,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from utils.rightbrain_api import get_rb_token, load_rb_config, log, detect_environment, get_api_root, get_model_id_by_name, get_rb_config
+    from utils.rightbrain_api import get_rb_token, load_rb_config, log, detect_environment, get_api_root, get_model_id_by_name, get_rb_config, api_root, SESSION
 except ImportError as e:
     print(f"❌ Error importing 'utils.rightbrain_api': {e}", file=sys.stderr)
     sys.exit(1)
@@ -47,7 +46,7 @@ def create_rb_task(rb_token: str, api_root: str, org_id: str, project_id: str, t
     log("info", f"Attempting to create task: '{task_name}'...")
     
     try:
-        response = requests.post(create_url, headers=headers, json=task_body)
+        response = SESSION.post(create_url, headers=headers, json=task_body)
         
         if not response.ok:
             log("error", f"Error creating task '{task_name}' (Status: {response.status_code})", details=response.text[:200])
@@ -75,13 +74,8 @@ def main():
         log("debug", f"Using API_ROOT: {rb_api_root}")
         
         # Temporarily set API_ROOT in environment for detect_environment to work
-        original_api_root = os.environ.get("API_ROOT")
-        os.environ["API_ROOT"] = rb_api_root
-        environment = detect_environment()
-        if original_api_root:
-            os.environ["API_ROOT"] = original_api_root
-        elif "API_ROOT" in os.environ:
-            del os.environ["API_ROOT"]
+        with api_root(rb_api_root):
+            environment = detect_environment()
         
         log("info", f"Detected environment: {environment}")
     except Exception as e:
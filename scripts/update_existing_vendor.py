@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 # --- Import Utils ---
 sys.path.append(str(Path(__file__).parent.parent))
 try:
-    from utils.github_api import create_github_issue, post_github_comment, parse_form_field, get_vendor_type_from_path
+    from utils.github_api import create_github_issue, post_github_comment, parse_all_form_fields, get_vendor_type_from_path
     from utils.rightbrain_api import log
 except ImportError:
     print("❌ Error: Could not import 'utils'.", file=sys.stderr)
@@ -27,17 +27,18 @@ def parse_existing_vendor_file(file_path: Path) -> dict:
     # Assumes filename is "vendor-name.md"
     vendor_name_guess = file_path.stem.replace("-", " ").title()
     
-    # 2. Extract Data using parse_form_field from utils
+    # 2. Extract Data using parse_all_form_fields from utils (one scan of the file)
     # Try to extract from the "Original Request" section first, then fallback to defaults
-    usage_context = parse_form_field(content, "Vendor/Service Usage Context")
+    fields = parse_all_form_fields(content)
+    usage_context = fields.get("vendor/service usage context", "N/A")
     if usage_context == "N/A":
         usage_context = "Reviewer to update."
     
-    data_types = parse_form_field(content, "Data Types Involved")
+    data_types = fields.get("data types involved", "N/A")
     if data_types == "N/A":
         data_types = "Reviewer to update."
     
-    service_desc = parse_form_field(content, "Service Description")
+    service_desc = fields.get("service description", "N/A")
     if service_desc == "N/A":
         service_desc = "Reviewer to update."
     
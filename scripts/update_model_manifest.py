@@ -3,7 +3,6 @@ import sys
 import json
 import requests
 from pathlib import Path
-from dotenv import load_dotenv
 
 # --- 1. Fix Import Path for 'utils' ---
 # Get the project root directory (two levels up from this script)
@@ -14,7 +13,7 @@ if str(project_root) not in sys.path:
 
 try:
     # Import shared utilities
-    from utils.rightbrain_api import get_rb_token, log, load_rb_config, detect_environment, _get_base_url
+    from utils.rightbrain_api import get_rb_token, log, load_rb_config, detect_environment, _get_base_url, api_root, SESSION
 except ImportError as e:
     print(f"❌ Error importing 'utils.rightbrain_api': {e}", file=sys.stderr)
     sys.exit(1)
@@ -34,7 +33,7 @@ def get_available_models(token, api_url, org_id, project_id):
     
     log("info", f"Fetching models from {models_url}...")
     try:
-        response = requests.get(models_url, headers=headers)
+        response = SESSION.get(models_url, headers=headers)
         response.raise_for_status()
         models_list = response.json()
         log("success", f"Found {len(models_list)} available models.")
@@ -118,6 +117,7 @@ def main():
     env_path = project_root / ".env"
     if env_path.exists():
         log("info", f"Loading environment from {env_path}")
+        from dotenv import load_dotenv
         load_dotenv(env_path)
 
     # Load config for URLs and determine environment
@@ -132,13 +132,8 @@ def main():
         if not rb_api_root.endswith('/api/v1'):
             rb_api_root = f"{rb_api_root}/api/v1"
         
-        original_api_root = os.environ.get("API_ROOT")
-        os.environ["API_ROOT"] = rb_api_root
-        environment = detect_environment()
-        if original_api_root:
-            os.environ["API_ROOT"] = original_api_root
-        elif "API_ROOT" in os.environ:
-            del os.environ["API_ROOT"]
+        with api_root(rb_api_root):
+            environment = detect_environment()
         
         log("info", f"Detected environment: {environment}")
     except Exception as e:
@@ -9,7 +9,7 @@ from datetime import datetime, timezone
 
 # Add parent directory to path to import shared utilities
 sys.path.append(str(Path(__file__).parent.parent))
-from utils.rightbrain_api import get_rb_token, log, detect_environment, get_api_root, get_model_id_by_name, get_rb_config
+from utils.rightbrain_api import get_rb_token, log, detect_environment, get_api_root, get_model_id_by_name, get_rb_config, SESSION
 
 # --- Manifest Helper Functions ---
 
@@ -154,7 +154,7 @@ def main():
             # Per API docs, Update Task uses a POST request
             # API URL should already include /api/v1
             url = f"{rb_api_root}/org/{rb_org_id}/project/{rb_project_id}/task/{existing_task_id}"
-            response = requests.post(url, headers=headers, json=task_payload, timeout=30)
+            response = SESSION.post(url, headers=headers, json=task_payload, timeout=30)
             response.raise_for_status()
             response_data = response.json()
             log("success", f"Step 1: Task '{task_filename}' updated successfully.")
@@ -176,7 +176,7 @@ def main():
                     ]
                 }
                 print("Running Step 2: Setting new revision as active...")
-                response = requests.post(url, headers=headers, json=active_payload, timeout=30)
+                response = SESSION.post(url, headers=headers, json=active_payload, timeout=30)
                 response.raise_for_status()
                 response_data = response.json() # Store the final response from this call
                 log("success", "Step 2: New revision set to active.")
@@ -187,7 +187,7 @@ def main():
             # Per API docs, Create Task uses a POST request
             # API URL should already include /api/v1
             url = f"{rb_api_root}/org/{rb_org_id}/project/{rb_project_id}/task"
-            response = requests.post(url, headers=headers, json=task_payload, timeout=30)
+            response = SESSION.post(url, headers=headers, json=task_payload, timeout=30)
             response.raise_for_status()
             response_data = response.json()
             log("success", f"Task '{task_filename}' created successfully (new tasks are active by default).")
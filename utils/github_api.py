@@ -2,16 +2,44 @@ import os
 import sys
 import json
 import re
+import functools
 import requests
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterator, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add parent directory to path to allow importing utils
 sys.path.append(str(Path(__file__).parent.parent))
-from utils.rightbrain_api import log
+from utils.rightbrain_api import log, SESSION
+
+_json_loads = orjson.loads if orjson else json.loads
+
+def _encode_json(payload: Dict) -> bytes:
+    """UTF-8 JSON request body in one encode pass (orjson when installed)."""
+    if orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+_VENDOR_NAME_CHARS = frozenset(map(ord, "abcdefghijklmnopqrstuvwxyz0123456789-"))
+
+class _SanitizeTable(dict):
+    """str.translate table: keeps [a-z0-9-] and maps every other character to a NUL placeholder."""
+    def __missing__(self, code: int) -> int:
+        value = code if code in _VENDOR_NAME_CHARS else 0
+        self[code] = value
+        return value
+
+_SANITIZE_TABLE = _SanitizeTable()
 
 # This module centralizes all GitHub API interactions.
 
+# (connect, read) seconds; bounds a stalled connection instead of hanging the workflow.
+GITHUB_TIMEOUT = (5, 30)
+
 def get_github_headers() -> Dict[str, str]:
     """Helper to get standard GitHub API headers."""
     gh_token = os.environ.get("GITHUB_TOKEN")
@@ -69,7 +97,7 @@ def update_issue_body(repo: str, issue_number: str, original_body: str, new_cont
 
 
     try:
-        response = requests.patch(url, headers=headers, json=payload)
+        response = SESSION.patch(url, headers=headers, json=payload, timeout=GITHUB_TIMEOUT)
         response.raise_for_status()
         log("success", f"Issue #{issue_number} body updated successfully.")
     except requests.exceptions.RequestException as e:
@@ -88,10 +116,12 @@ def post_github_comment(repo: str, issue_number: str, body: str):
     """Posts a new comment to the GitHub issue."""
     url = f"https://api.github.com/repos/{repo}/issues/{issue_number}/comments"
     headers = get_github_headers()
-    payload = {"body": body}
+    headers["Content-Type"] = "application/json; charset=utf-8"
+    # The report comment is the largest body we send; encode it once rather than via json=
+    data = _encode_json({"body": body})
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = SESSION.post(url, headers=headers, data=data, timeout=GITHUB_TIMEOUT)
         response.raise_for_status()
         log("success", f"Successfully posted comment to issue #{issue_number}.")
     except requests.exceptions.RequestException as e:
@@ -103,15 +133,19 @@ def post_github_comment(repo: str, issue_number: str, body: str):
         raise RuntimeError(f"Failed to post GitHub comment: {e}")
 
 def fetch_issue_comments(repo: str, issue_number: str) -> List[Dict]:
-    """Fetches all comments on a specific issue."""
+    """Fetches all comments on a specific issue, following pagination."""
     log("info", f"Fetching comments for issue {repo}#{issue_number}...")
-    url = f"https://api.github.com/repos/{repo}/issues/{issue_number}/comments"
+    url = f"https://api.github.com/repos/{repo}/issues/{issue_number}/comments?per_page=100"
     headers = get_github_headers()
+    comments = []
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        while url:
+            response = SESSION.get(url, headers=headers, timeout=GITHUB_TIMEOUT)
+            response.raise_for_status()
+            comments.extend(_json_loads(response.content))
+            url = response.links.get("next", {}).get("url")
+        return comments
     except requests.exceptions.RequestException as e:
         log("error", "Failed to fetch comments", details=str(e))
         # This is a critical failure for the commit script.
@@ -144,26 +178,77 @@ def post_failure_and_exit(repo: str, issue_number: str, original_body: str, fail
 
 # --- GitHub Issue / Markdown Parsing Helpers ---
 
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+@functools.lru_cache(maxsize=64)
+def _field_pattern(field_name: str) -> re.Pattern:
+    """Compiles the section pattern for a form field label once per label."""
+    return re.compile(rf'### {re.escape(field_name)}\s*\n\s*(.*?)(?=\n### |\Z)', re.IGNORECASE | re.DOTALL)
+
 def parse_form_field(body: str, field_name: str) -> str:
     """Parses a form field value from markdown content (e.g., GitHub issue body)."""
-    pattern = re.compile(rf'### {re.escape(field_name)}\s*\n\s*(.*?)(?=\n### |\Z)', re.IGNORECASE | re.DOTALL)
-    match = pattern.search(body)
+    # Cheap substring prefilter; the lower() copy is only paid when the exact-case label is absent
+    if field_name not in body and field_name.lower() not in body.lower():
+        return "N/A"
+    match = _field_pattern(field_name).search(body)
     if match:
         value = match.group(1).strip()
         # Remove HTML tags if present
-        value = re.sub(r'<[^>]+>', '', value)
+        value = _HTML_TAG_PATTERN.sub('', value)
         return value
     return "N/A"
 
-def extract_vendor_usage_details(markdown_content: str) -> str:
-    """Builds the vendor-specific {vendor_usage_details} context block from markdown content."""
+_ALL_FIELDS_PATTERN = re.compile(r'^### (.+?)\s*\n([\s\S]*?)(?=\n### |\Z)', re.MULTILINE)
+
+def _iter_form_sections(body: str) -> Iterator[Tuple[str, str]]:
+    """Yields (label, raw_value) for every '### Label' section, in body order."""
+    for match in _ALL_FIELDS_PATTERN.finditer(body):
+        yield match.group(1), match.group(2)
+
+def parse_all_form_fields(body: str) -> Dict[str, str]:
+    """
+    Parses every '### Label' section of an issue form in one pass.
+    Returns {label.lower(): value}; values are cleaned as in parse_form_field,
+    so callers use fields.get(label.lower(), "N/A") in its place.
+    """
+    fields: Dict[str, str] = {}
+    for label, raw_value in _iter_form_sections(body):
+        fields.setdefault(label.lower(), _HTML_TAG_PATTERN.sub('', raw_value.strip()))
+    return fields
+
+def scan_issue_body(body: str) -> Tuple[Dict[str, str], str]:
+    """
+    Single walk over an issue body. Returns (fields, checklist_text): the
+    parse_all_form_fields dict plus the raw text of only those sections that
+    contain a checked box, so the checklist regex never rescans the form answers.
+    """
+    fields: Dict[str, str] = {}
+    checked_sections: List[str] = []
+    first_match = _ALL_FIELDS_PATTERN.search(body)
+    preamble = body if first_match is None else body[:first_match.start()]
+    if "[x]" in preamble or "[X]" in preamble:
+        checked_sections.append(preamble)
+    for label, raw_value in _iter_form_sections(body):
+        fields.setdefault(label.lower(), _HTML_TAG_PATTERN.sub('', raw_value.strip()))
+        if "[x]" in raw_value or "[X]" in raw_value:
+            checked_sections.append(raw_value)
+    return fields, "\n".join(checked_sections)
+
+def extract_vendor_usage_details(markdown_content: str, fields: Optional[Dict[str, str]] = None) -> str:
+    """
+    Builds the vendor-specific {vendor_usage_details} context block from markdown content.
+    Pass `fields` from parse_all_form_fields to reuse an existing parse.
+    """
     log("info", "Parsing vendor usage details from markdown content...")
+    if fields is None:
+        fields = parse_all_form_fields(markdown_content)
+    usage_summary = fields.get('summary of proposed usage', 'N/A')
     context_parts = [
-        f"**Service Name:** {parse_form_field(markdown_content, 'Supplier Name')}",
-        f"**Service Description:** {parse_form_field(markdown_content, 'Summary of Proposed Usage')}",
-        f"**Vendor/Service Usage Context:** {parse_form_field(markdown_content, 'Summary of Proposed Usage')}", 
-        f"**Data Types Involved:** {parse_form_field(markdown_content, 'Data Types Involved')}",
-        f"**Term Length:** {parse_form_field(markdown_content, 'Minimum Term Length')}",
+        f"**Service Name:** {fields.get('supplier name', 'N/A')}",
+        f"**Service Description:** {usage_summary}",
+        f"**Vendor/Service Usage Context:** {usage_summary}", 
+        f"**Data Types Involved:** {fields.get('data types involved', 'N/A')}",
+        f"**Term Length:** {fields.get('minimum term length', 'N/A')}",
     ]
     return "\n".join(context_parts)
 
@@ -179,7 +264,7 @@ def create_github_issue(repo: str, title: str, body: str, labels: Optional[List[
         payload["labels"] = labels
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = SESSION.post(url, headers=headers, json=payload, timeout=GITHUB_TIMEOUT)
         response.raise_for_status()
         log("success", f"Successfully created issue: {title}")
         return response.json()
@@ -202,11 +287,15 @@ def get_vendor_type_from_path(file_path_str: str) -> str:
 def get_sanitized_vendor_name(summary_data: Dict) -> str:
     """Creates a filesystem-safe vendor name from summary data."""
     processor_name = summary_data.get("processor_name", "vendor")
-    sanitized = re.sub(r"[^a-z0-9-]+", "-", processor_name.lower()).strip("-")
-    return sanitized
+    sanitized = processor_name.lower().translate(_SANITIZE_TABLE)
+    # Collapse each run of replaced characters into a single "-" (as re.sub(r"[^a-z0-9-]+", "-") did)
+    while "\0\0" in sanitized:
+        sanitized = sanitized.replace("\0\0", "\0")
+    return sanitized.replace("\0", "-").strip("-")
 
-def load_company_profile() -> str:
-    """Loads the company profile and formats it as a string for the {company_profile} block."""
+@functools.lru_cache(maxsize=1)
+def _load_company_profile_dict() -> Dict:
+    """Reads and parses config/company_profile.json once per process."""
     log("info", "Loading company profile...")
     project_root = Path(__file__).resolve().parent.parent
     profile_path = project_root / "config" / "company_profile.json"
@@ -215,17 +304,20 @@ def load_company_profile() -> str:
         sys.exit(1)
     
     try:
-        with open(profile_path, 'r') as f:
-            data = json.load(f)
-        
-        # Format as markdown string, as expected by the tasks
-        profile_parts = [
-            f"**Company Name:** {data.get('name')}",
-            f"**Industry:** {data.get('industry')}",
-            f"**Services:** {data.get('services')}",
-            f"**Applicable Regulations:** {', '.join(data.get('regulations', []))}"
-        ]
-        return "\n".join(profile_parts)
-    except Exception as e:
+        return _json_loads(profile_path.read_bytes())
+    except (OSError, ValueError) as e:
         log("error", f"Error reading company profile: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+def load_company_profile() -> str:
+    """Formats the (cached) company profile as a string for the {company_profile} block."""
+    data = _load_company_profile_dict()
+    
+    # Format as markdown string, as expected by the tasks
+    profile_parts = [
+        f"**Company Name:** {data.get('name')}",
+        f"**Industry:** {data.get('industry')}",
+        f"**Services:** {data.get('services')}",
+        f"**Applicable Regulations:** {', '.join(data.get('regulations', []))}"
+    ]
+    return "\n".join(profile_parts)
\ No newline at end of file
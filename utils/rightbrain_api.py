@@ -3,42 +3,76 @@ import sys
 import json
 import requests
 import time
+import functools
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, Literal
+from typing import Dict, Any, Optional, Literal, Iterator
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Load .env file from project root if it exists (for local development)
+# Optional: orjson for faster encoding of large task payloads
 try:
-    from dotenv import load_dotenv
-    project_root = Path(__file__).resolve().parent.parent
-    env_path = project_root / ".env"
-    if env_path.exists():
-        load_dotenv(env_path)
+    import orjson
 except ImportError:
-    pass
+    orjson = None
+
+# Load .env file from project root if it exists (for local development)
+project_root = Path(__file__).resolve().parent.parent
+env_path = project_root / ".env"
+if env_path.exists():
+    # dotenv is only imported when there is a .env to load (never in CI)
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(env_path)
+    except ImportError:
+        pass
 
 # --- Centralized Logging ---
 
+_LOG_ICONS = {
+    "success": "✅",
+    "error": "❌",
+    "info": "ℹ️",
+    "warning": "⚠️",
+    "debug": "🔍"
+}
+_LOG_RANKS = {"debug": 10, "info": 20, "success": 20, "warning": 30, "error": 40}
+# LOG_LEVEL (debug|info|warning|error) suppresses lower levels; the default keeps everything
+_LOG_THRESHOLD = _LOG_RANKS.get(os.environ.get("LOG_LEVEL", "debug").lower(), 10)
+
+def log_enabled_for(level: str) -> bool:
+    """True if log() would emit at this level; use it to skip building costly messages."""
+    return _LOG_RANKS.get(level, 20) >= _LOG_THRESHOLD
+
 def log(
     level: Literal["success", "error", "info", "warning", "debug"],
     message: str,
     details: Optional[str] = None,
     to_stderr: bool = False
 ) -> None:
-    icons = {
-        "success": "✅",
-        "error": "❌",
-        "info": "ℹ️",
-        "warning": "⚠️",
-        "debug": "🔍"
-    }
-    icon = icons.get(level, "ℹ️")
+    if not log_enabled_for(level):
+        return
+    icon = _LOG_ICONS.get(level, "ℹ️")
     output = sys.stderr if (to_stderr or level == "error") else sys.stdout
     timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
     print(f"[{timestamp}] {icon} {message}", file=output)
     if details:
         print(f"               {details}", file=output)
 
+# --- Shared HTTP Session ---
+# One pooled session for all Rightbrain and GitHub calls, so each host costs a single
+# TCP/TLS handshake. Retry keeps urllib3's default allowed_methods: POSTs (task runs,
+# comments) are only retried on connection failures, never re-sent after a 5xx.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
 # --- Configuration Loader ---
 
 def load_rb_config() -> Dict[str, str]:
@@ -47,26 +81,17 @@ def load_rb_config() -> Dict[str, str]:
         config_path = root_dir / "config/rightbrain.config.json"
         if not config_path.exists():
             return {}
-        with open(config_path, "r") as f:
-            return json.load(f)
+        return _decode_json_body(config_path.read_bytes())
     except Exception as e:
         log("error", f"Failed to load config file: {e}")
         sys.exit(1)
 
 # --- API Functions ---
 
-_token_cache: Optional[tuple[str, float]] = None
+# (client_id, token_url) -> (token, expiry_time)
+_token_cache: Dict[tuple[str, str], tuple[str, float]] = {}
 
 def get_rb_token() -> str:
-    global _token_cache
-    if _token_cache is not None:
-        cached_token, expiry_time = _token_cache
-        if time.time() < (expiry_time - 60):
-            log("debug", f"Using cached token (expires in {int(expiry_time - time.time())}s)")
-            log("debug", f"Token preview: {cached_token[:20]}...{cached_token[-10:] if len(cached_token) > 30 else ''}")
-            return cached_token
-
-    log("debug", "Fetching new authentication token...")
     config = load_rb_config()
     client_id = os.environ.get("RB_CLIENT_ID")
     client_secret = os.environ.get("RB_CLIENT_SECRET")
@@ -125,9 +150,19 @@ def get_rb_token() -> str:
 
     log("debug", f"Token URL: {token_url}")
 
+    cache_key = (client_id, token_url)
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        cached_token, expiry_time = cached
+        if time.time() < (expiry_time - 60):
+            log("debug", f"Using cached token (expires in {int(expiry_time - time.time())}s)")
+            log("debug", f"Token preview: {cached_token[:20]}...{cached_token[-10:] if len(cached_token) > 30 else ''}")
+            return cached_token
+
+    log("debug", "Fetching new authentication token...")
     try:
         log("debug", "Sending token request...")
-        response = requests.post(
+        response = SESSION.post(
             token_url,
             auth=(client_id, client_secret),
             data={"grant_type": "client_credentials", "scope": "offline_access"},
@@ -146,7 +181,7 @@ def get_rb_token() -> str:
             sys.exit(1)
         
         expires_in = response_data.get("expires_in", 3600)
-        _token_cache = (token, time.time() + expires_in)
+        _token_cache[cache_key] = (token, time.time() + expires_in)
         log("success", f"Token obtained successfully (expires in {expires_in}s)")
         log("debug", f"Token preview: {token[:20]}...{token[-10:] if len(token) > 30 else ''}")
         log("debug", f"Token length: {len(token)} characters")
@@ -158,6 +193,18 @@ def get_rb_token() -> str:
 def _get_api_headers(rb_token: str) -> Dict[str, str]:
     return {"Authorization": f"Bearer {rb_token}", "Content-Type": "application/json"}
 
+def _encode_json_body(payload: Dict[str, Any]) -> bytes:
+    """Encodes a request body to UTF-8 JSON once, bypassing requests' stdlib json= path."""
+    if orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+def _decode_json_body(content: bytes) -> Any:
+    """Decodes a JSON response body straight from bytes."""
+    if orjson:
+        return orjson.loads(content)
+    return json.loads(content)
+
 def get_api_root() -> str:
     # Priority 1: API_ROOT env var
     api_root = os.environ.get("API_ROOT")
@@ -177,12 +224,31 @@ def get_api_root() -> str:
     api_url = api_url.rstrip('/')
     return api_url if api_url.endswith('/api/v1') else f"{api_url}/api/v1"
 
+@contextmanager
+def api_root(value: str) -> Iterator[str]:
+    """Sets API_ROOT for the duration of the block (e.g. for detect_environment), then restores the previous value."""
+    original = os.environ.get("API_ROOT")
+    os.environ["API_ROOT"] = value
+    try:
+        yield value
+    finally:
+        if original:
+            os.environ["API_ROOT"] = original
+        else:
+            os.environ.pop("API_ROOT", None)
+
 def get_rb_config() -> Dict[str, str]:
-    org_id = os.environ.get("RB_ORG_ID")
-    project_id = os.environ.get("RB_PROJECT_ID")
-    client_id = os.environ.get("RB_CLIENT_ID")
-    client_secret = os.environ.get("RB_CLIENT_SECRET")
-    
+    return _validated_rb_config(
+        os.environ.get("RB_ORG_ID"),
+        os.environ.get("RB_PROJECT_ID"),
+        os.environ.get("RB_CLIENT_ID"),
+        os.environ.get("RB_CLIENT_SECRET"),
+    )
+
+@functools.lru_cache(maxsize=4)
+def _validated_rb_config(org_id: Optional[str], project_id: Optional[str],
+                         client_id: Optional[str], client_secret: Optional[str]) -> Dict[str, str]:
+    """Checks and logs the RB secrets once per distinct set of values (get_project_path and run_rb_task call this per request)."""
     log("debug", f"Config check - Org ID: {org_id[:8] if org_id and len(org_id) > 8 else org_id}...")
     log("debug", f"Config check - Project ID: {project_id[:8] if project_id and len(project_id) > 8 else project_id}...")
     log("debug", f"Config check - Client ID: {'present' if client_id else 'missing'}")
@@ -216,6 +282,29 @@ def detect_environment() -> str:
 
 # --- DYNAMIC TASK RESOLUTION ---
 
+@functools.lru_cache(maxsize=1)
+def load_task_manifest() -> Dict[str, Any]:
+    """Reads tasks/task_manifest.json once per process. Returns {} if it is missing."""
+    manifest_path = Path(__file__).resolve().parent.parent / "tasks" / "task_manifest.json"
+    if not manifest_path.exists():
+        return {}
+    return _decode_json_body(manifest_path.read_bytes())
+
+@functools.lru_cache(maxsize=4)
+def get_task_manifest(environment: str) -> Dict[str, Optional[str]]:
+    """
+    Flattens the manifest's section for one environment into {task_name: task_id}.
+    The first entry wins when a name repeats. Returns {} if the environment is absent.
+    """
+    manifest = load_task_manifest()
+    task_map: Dict[str, Optional[str]] = {}
+    if isinstance(manifest, dict) and environment in manifest:
+        for val in manifest[environment].values():
+            # Handle val as dict {name:..., id:...} or string ID
+            if isinstance(val, dict) and 'name' in val:
+                task_map.setdefault(val['name'], val.get('id'))
+    return task_map
+
 def fetch_remote_tasks_map(rb_token: str) -> Dict[str, str]:
     """
     Fetches ALL tasks from the API and builds a {task_name: task_id} map.
@@ -224,9 +313,9 @@ def fetch_remote_tasks_map(rb_token: str) -> Dict[str, str]:
     url = f"{get_api_root()}{get_project_path()}/task"
     try:
         log("debug", "Fetching remote task list for dynamic resolution...")
-        response = requests.get(url, headers=_get_api_headers(rb_token))
+        response = SESSION.get(url, headers=_get_api_headers(rb_token))
         response.raise_for_status()
-        tasks = response.json()
+        tasks = _decode_json_body(response.content)
         
         # Build map: {"Document Discovery Task": "uuid-...", ...}
         task_map = {t.get("name"): t.get("id") for t in tasks if t.get("name") and t.get("id")}
@@ -236,39 +325,36 @@ def fetch_remote_tasks_map(rb_token: str) -> Dict[str, str]:
         log("warning", f"Could not fetch remote task list: {e}")
         return {}
 
+# (task_name, environment) -> task_id; only successful lookups are kept
+_task_id_cache: Dict[tuple[str, str], str] = {}
+
 def get_task_id_by_name(task_name: str, environment: Optional[str] = None) -> Optional[str]:
     """
     1. Tries local manifest based on environment.
     2. If not found or if environment seems wrong, fetches from API (Dynamic Resolution).
+    Resolved IDs are memoized per (name, environment) for the life of the process.
     """
     if environment is None:
         environment = detect_environment()
 
+    cache_key = (task_name, environment)
+    task_id = _task_id_cache.get(cache_key)
+    if task_id is None:
+        task_id = _resolve_task_id(task_name, environment)
+        if task_id:
+            _task_id_cache[cache_key] = task_id
+    return task_id
+
+def _resolve_task_id(task_name: str, environment: str) -> Optional[str]:
     # --- ATTEMPT 1: Local Manifest ---
     log("debug", f"Resolving '{task_name}' for environment '{environment}' via Manifest...")
-    project_root = Path(__file__).resolve().parent.parent
-    manifest_path = project_root / "tasks" / "task_manifest.json"
-    local_id = None
-    
-    if manifest_path.exists():
-        try:
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-            
-            # Handle Nested Manifest (staging/production keys)
-            if isinstance(manifest, dict) and environment in manifest:
-                env_section = manifest[environment]
-                for key, val in env_section.items():
-                    # Handle val as dict {name:..., id:...} or string ID
-                    if isinstance(val, dict) and val.get('name') == task_name:
-                        local_id = val.get('id')
-                        break
-            
-            if local_id:
-                log("debug", f"Found ID in manifest: {local_id}")
-                return local_id
-        except Exception as e:
-            log("warning", f"Manifest read failed: {e}")
+    try:
+        local_id = get_task_manifest(environment).get(task_name)
+        if local_id:
+            log("debug", f"Found ID in manifest: {local_id}")
+            return local_id
+    except Exception as e:
+        log("warning", f"Manifest read failed: {e}")
 
     # --- ATTEMPT 2: Dynamic Resolution (Self-Healing) ---
     # If we are here, either the manifest is missing, the task is missing in manifest,
@@ -307,11 +393,12 @@ def run_rb_task(rb_token: str, task_id: str, task_input_payload: Dict[str, Any],
     run_url = f"{get_api_root()}{get_project_path()}/task/{task_id}/run"
     
     # Debug logging
-    log("debug", f"API Root: {get_api_root()}")
-    log("debug", f"Project Path: {get_project_path()}")
-    log("debug", f"Full Run URL: {run_url}")
-    log("debug", f"Token preview: {rb_token[:20]}...{rb_token[-10:] if len(rb_token) > 30 else ''}")
-    log("debug", f"Token length: {len(rb_token)} characters")
+    if log_enabled_for("debug"):
+        log("debug", f"API Root: {get_api_root()}")
+        log("debug", f"Project Path: {get_project_path()}")
+        log("debug", f"Full Run URL: {run_url}")
+        log("debug", f"Token preview: {rb_token[:20]}...{rb_token[-10:] if len(rb_token) > 30 else ''}")
+        log("debug", f"Token length: {len(rb_token)} characters")
     
     # Redact sensitive data for logging
     logged_input = task_input_payload.copy()
@@ -324,15 +411,16 @@ def run_rb_task(rb_token: str, task_id: str, task_input_payload: Dict[str, Any],
         headers = _get_api_headers(rb_token)
         log("debug", f"Request headers: Authorization=Bearer ***, Content-Type={headers.get('Content-Type')}")
         
-        response = requests.post(
+        response = SESSION.post(
             run_url, 
             headers=headers, 
-            json={"task_input": task_input_payload}, 
+            data=_encode_json_body({"task_input": task_input_payload}), 
             timeout=600
         )
         
-        log("debug", f"Response status: {response.status_code}")
-        log("debug", f"Response headers: {dict(response.headers)}")
+        if log_enabled_for("debug"):
+            log("debug", f"Response status: {response.status_code}")
+            log("debug", f"Response headers: {dict(response.headers)}")
         
         if response.status_code == 404:
              # This catches the exact error you are seeing
@@ -354,7 +442,7 @@ def run_rb_task(rb_token: str, task_id: str, task_input_payload: Dict[str, Any],
              
         response.raise_for_status()
         log("success", f"{task_name} complete.")
-        return response.json()
+        return _decode_json_body(response.content)
     except requests.exceptions.HTTPError as e:
         log("error", f"{task_name} failed with HTTP error", details=str(e))
         if hasattr(e.response, 'text'):